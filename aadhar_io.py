@@ -0,0 +1,134 @@
+import glob
+import os
+from typing import Literal, Tuple
+
+import re
+
+import numpy as np
+import pandas as pd
+import polars as pl
+import polars.selectors as cs
+
+# --- Locations ---
+base_dir = r"l:\Adhar_data"
+cache_dir = os.path.join(base_dir, "_cache")
+
+# Bump when the shape of the cached frames changes so stale snapshots are ignored
+SNAPSHOT_VERSION = 7
+
+Dataset = Literal['enr', 'demo', 'bio']
+
+# dataset -> (source folder, snapshot name)
+DATASETS = {
+    'enr': ("api_data_aadhar_enrolment", "enrolment"),
+    'demo': ("api_data_aadhar_demographic", "demo"),
+    'bio': ("api_data_aadhar_biometric", "bio"),
+}
+
+# dataset -> (derived column, columns it sums). Only totals something reads per row belong
+# here; biometric totals are summed per state where they're used.
+TOTALS = {
+    'enr': ('total_enrolment', ['age_0_5', 'age_5_17', 'age_18_greater']),
+}
+
+# Datasets whose numeric gaps are filled with 0. Demographic numerics are only ever summed
+# (which skips nulls), so that pass is skipped for them.
+FILL_NUMERIC = {'enr', 'bio'}
+
+# Count columns (and pincode) that are stored as int32 when their values fit
+INT32_COLUMNS = re.compile(r'^(age_|bio_age_|demo_age_)|^pincode$')
+INT32_MAX = np.iinfo(np.int32).max
+
+
+def clean_column_name(name):
+    """Normalises a CSV header, e.g. "Age 0 5 " -> "age_0_5"."""
+    return name.strip().lower().replace(' ', '_')
+
+
+def find_csv_files(path):
+    # Support both direct and nested structure just in case
+    files = glob.glob(os.path.join(path, "*.csv"))
+    if not files:
+        files = glob.glob(os.path.join(path, "**", "*.csv"), recursive=True)
+    print(f"Scanning {path}, found {len(files)} files.")
+    return files
+
+
+def build_snapshot(files, dataset, cache_path):
+    """Streams the CSV shards through the cleaning steps straight into a Parquet snapshot.
+
+    Returns False (and writes nothing) when none of the shards could be read.
+    """
+    # One lazy scan per shard with its own header cleaned, then lined up by column name:
+    # shards may differ in header case, spacing or column order. Types are inferred from the
+    # whole file so a late "2.5" widens the column instead of being nulled by ignore_errors.
+    lazy_frames = []
+    for file in files:
+        lf = pl.scan_csv(file, ignore_errors=True, infer_schema_length=None)
+        try:
+            raw_names = lf.collect_schema().names()
+        except Exception as e:
+            print(f"Error reading {file}: {e}")
+            continue
+        lazy_frames.append(lf.rename({c: clean_column_name(c) for c in raw_names}))
+    if not lazy_frames:
+        return False
+    lf = pl.concat(lazy_frames, how="diagonal_relaxed")
+    names = lf.collect_schema().names()
+    # Parse dates once over the combined column with the known format; cache=True means
+    # each distinct date string is parsed only once
+    date_col = next((col for col in names if 'date' in col), None)
+    if date_col:
+        lf = lf.with_columns(pl.col(date_col).str.to_datetime('%d-%m-%Y', time_unit='ms', strict=False, cache=True))
+    # Categorical keys: stored dictionary-encoded and read back by pandas as category columns
+    lf = lf.with_columns(pl.col(c).cast(pl.Categorical) for c in ('state', 'district') if c in names)
+    if dataset in FILL_NUMERIC:
+        lf = lf.with_columns(cs.numeric().fill_null(0))
+    if dataset in TOTALS:
+        total_col, parts = TOTALS[dataset]
+        # Fused row-wise sum: one pass over the parts per streamed batch, no intermediate
+        # columns (what df.eval/numexpr would buy on the pandas side)
+        lf = lf.with_columns(pl.sum_horizontal(parts).alias(total_col))
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write then rename so another app starting at the same time never reads a half-written file
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    lf.sink_parquet(tmp_path, compression='zstd', engine='streaming')
+    os.replace(tmp_path, cache_path)
+    return True
+
+
+def load(dataset: Dataset) -> pd.DataFrame:
+    """Returns one dataset, from the shared Parquet snapshot when it is newer than every CSV."""
+    folder, name = DATASETS[dataset]
+    files = find_csv_files(os.path.join(base_dir, folder, folder))
+    if not files:
+        return pd.DataFrame()
+
+    cache_path = os.path.join(cache_dir, f"{name}.v{SNAPSHOT_VERSION}.parquet")
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) > max(os.path.getmtime(f) for f in files):
+        print(f"Using cached snapshot {cache_path}")
+    else:
+        # The CSVs never materialise as a frame: they stream into the snapshot, and the
+        # snapshot is read back into a single allocation (~1x the final size at peak)
+        if not build_snapshot(files, dataset, cache_path):
+            return pd.DataFrame()
+    df = pd.read_parquet(cache_path)
+    # Polars keeps categories in first-seen order; sort them so categorical groupbys and
+    # sorts come out alphabetical, as they did on plain strings
+    for col in ('state', 'district'):
+        if col in df.columns:
+            df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+    # Per-row counts fit in int32, which halves the bytes every aggregation scans. Sums still
+    # come out int64 (pandas and DuckDB both widen) and the total column is left int64.
+    # A column with any value out of range keeps its int64 type instead of failing the load.
+    for col in df.columns:
+        if INT32_COLUMNS.match(col) and df[col].dtype == 'int64':
+            if df[col].min() >= -INT32_MAX - 1 and df[col].max() <= INT32_MAX:
+                df[col] = df[col].astype('int32')
+    return df
+
+
+def load_all() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Returns (enrolment, demographic, biometric) frames."""
+    return load('enr'), load('demo'), load('bio')
@@ -1,8 +1,6 @@
 
 import streamlit as st
-import pandas as pd
-import glob
-import os
+from aadhar_io import load_all
 import seaborn as sns
 import matplotlib.pyplot as plt
 
@@ -10,33 +8,11 @@ import matplotlib.pyplot as plt
 st.set_page_config(page_title="Aadhar Data Dashboard", layout="wide")
 
 # --- Data Loading (Cached) ---
-@st.cache_data
+# cache_resource hands back the same frames on every rerun without hashing/pickling them,
+# so page code must treat them as read-only (derive new frames, never assign columns).
+@st.cache_resource
 def load_data():
-    base_dir = r"l:\Adhar_data"
-    enrolment_path = os.path.join(base_dir, "api_data_aadhar_enrolment", "api_data_aadhar_enrolment")
-    demographic_path = os.path.join(base_dir, "api_data_aadhar_demographic", "api_data_aadhar_demographic")
-    biometric_path = os.path.join(base_dir, "api_data_aadhar_biometric", "api_data_aadhar_biometric")
-
-    def read_folder(path):
-        files = glob.glob(os.path.join(path, "*.csv"))
-        df_list = []
-        for file in files:
-            try:
-                df_list.append(pd.read_csv(file))
-            except:
-                pass
-        return pd.concat(df_list, ignore_index=True) if df_list else pd.DataFrame()
-
-    df_enrolment = read_folder(enrolment_path)
-    df_demographic = read_folder(demographic_path)
-    df_biometric = read_folder(biometric_path)
-
-    # Generic Cleaning
-    for df in [df_enrolment, df_demographic, df_biometric]:
-        if not df.empty:
-            df.columns = df.columns.astype(str).str.strip().str.lower().str.replace(' ', '_')
-
-    return df_enrolment, df_demographic, df_biometric
+    return load_all()
 
 df_enrolment, df_demographic, df_biometric = load_data()
 
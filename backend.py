@@ -1,53 +1,39 @@
-from fastapi import FastAPI, HTTPException
-import pandas as pd
-import glob
-import os
+from fastapi import FastAPI, HTTPException, Response
+import duckdb
+import threading
+import json
+from functools import lru_cache
 from typing import List, Dict, Any
+from aadhar_io import load_all
 
 app = FastAPI(title="Aadhar Data Advanced API")
 
-# --- Data Loading Utility ---
-base_dir = r"l:\Adhar_data"
-enrolment_path = os.path.join(base_dir, "api_data_aadhar_enrolment", "api_data_aadhar_enrolment")
-demographic_path = os.path.join(base_dir, "api_data_aadhar_demographic", "api_data_aadhar_demographic")
-biometric_path = os.path.join(base_dir, "api_data_aadhar_biometric", "api_data_aadhar_biometric")
-
-def load_df_from_folder(path):
-    # Support both direct and nested structure just in case
-    files = glob.glob(os.path.join(path, "*.csv"))
-    if not files:
-        files = glob.glob(os.path.join(path, "**", "*.csv"), recursive=True)
-        
-    print(f"Scanning {path}, found {len(files)} files.")
-    df_list = []
-    for file in files:
-        try:
-            df = pd.read_csv(file)
-            # Basic cleaning
-            df.columns = df.columns.astype(str).str.strip().str.lower().str.replace(' ', '_')
-            
-            # Convert date if exists
-            date_col = next((col for col in df.columns if 'date' in col), None)
-            if date_col:
-                df[date_col] = pd.to_datetime(df[date_col], format='%d-%m-%Y', errors='coerce')
-                
-            df_list.append(df)
-        except Exception as e:
-            print(f"Error reading {file}: {e}")
-            pass
-    return pd.concat(df_list, ignore_index=True) if df_list else pd.DataFrame()
-
-# Load data on startup
+# Load data on startup (shared Parquet snapshot, see aadhar_io)
 print("Loading data...")
-df_enrolment = load_df_from_folder(enrolment_path)
-df_demographic = load_df_from_folder(demographic_path)
-df_biometric = load_df_from_folder(biometric_path)
+df_enrolment, df_demographic, df_biometric = load_all()
+
+# Analytics run in DuckDB directly over the in-memory frames (registered as zero-copy views).
+# FastAPI serves sync endpoints from a thread pool and a DuckDB connection isn't thread-safe.
+con = duckdb.connect()
+con_lock = threading.Lock()
+if not df_enrolment.empty:
+    con.register('enr', df_enrolment)
+    # Per-district totals, aggregated once at startup: ranking requests filter and sort this
+    # small table (a few hundred rows) instead of rescanning every enrolment row
+    con.execute("""
+        CREATE TABLE district_totals AS
+        SELECT state::VARCHAR AS state, district::VARCHAR AS district,
+               SUM(total_enrolment)::BIGINT AS total
+        FROM enr
+        WHERE state IS NOT NULL AND district IS NOT NULL
+        GROUP BY state, district
+    """)
+if not df_biometric.empty:
+    con.register('bio', df_biometric)
 
-# Fill NaN for numeric columns
-for df in [df_enrolment, df_demographic, df_biometric]:
-    if not df.empty:
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        df[numeric_cols] = df[numeric_cols].fillna(0)
+def query(sql, params=None):
+    with con_lock:
+        return con.execute(sql, params or []).fetch_df()
 
 print("Data loaded.")
 
@@ -55,8 +41,13 @@ print("Data loaded.")
 def read_root():
     return {"message": "Aadhar Data Advanced Analytics API"}
 
-@app.get("/stats")
-def get_stats():
+# --- Response caching ---
+# The frames never change after startup, so each endpoint's JSON body is computed once
+# and served from memory afterwards (the API-side equivalent of st.cache_data).
+def json_response(body):
+    return Response(content=body, media_type="application/json")
+
+def compute_stats():
     return {
         "enrolment": {
             "total_records": int(len(df_enrolment)),
@@ -74,49 +65,118 @@ def get_stats():
         }
     }
 
-@app.get("/analytics/state-summary")
-def get_state_summary():
+@lru_cache(maxsize=1)
+def _stats_json() -> str:
+    return json.dumps(compute_stats())
+
+@app.get("/stats")
+def get_stats():
+    return json_response(_stats_json())
+
+def compute_state_summary():
     """Returns aggregated metrics per state for all datasets."""
     summary = {}
     
     if not df_enrolment.empty:
-        enrol_grp = df_enrolment.groupby('state')[['age_0_5', 'age_5_17', 'age_18_greater']].sum().reset_index()
-        enrol_grp['total_enrolment'] = enrol_grp['age_0_5'] + enrol_grp['age_5_17'] + enrol_grp['age_18_greater']
+        enrol_grp = query("""
+            SELECT state,
+                   SUM(age_0_5)::BIGINT AS age_0_5,
+                   SUM(age_5_17)::BIGINT AS age_5_17,
+                   SUM(age_18_greater)::BIGINT AS age_18_greater,
+                   SUM(total_enrolment)::BIGINT AS total_enrolment
+            FROM enr
+            WHERE state IS NOT NULL
+            GROUP BY state
+            ORDER BY state::VARCHAR
+        """)
         summary['enrolment'] = enrol_grp.to_dict(orient='records')
 
     if not df_biometric.empty:
-        bio_grp = df_biometric.groupby('state')[['bio_age_5_17', 'bio_age_17_']].sum().reset_index()
-        bio_grp['total_biometric'] = bio_grp['bio_age_5_17'] + bio_grp['bio_age_17_']
+        bio_grp = query("""
+            SELECT state,
+                   SUM(bio_age_5_17)::BIGINT AS bio_age_5_17,
+                   SUM(bio_age_17_)::BIGINT AS bio_age_17_,
+                   SUM(bio_age_5_17 + bio_age_17_)::BIGINT AS total_biometric
+            FROM bio
+            WHERE state IS NOT NULL
+            GROUP BY state
+            ORDER BY state::VARCHAR
+        """)
         summary['biometric'] = bio_grp.to_dict(orient='records')
         
     return summary
 
-@app.get("/analytics/trends")
-def get_trends():
+@lru_cache(maxsize=1)
+def _state_summary_json() -> str:
+    return json.dumps(compute_state_summary())
+
+@app.get("/analytics/state-summary")
+def get_state_summary():
+    """Returns aggregated metrics per state for all datasets."""
+    return json_response(_state_summary_json())
+
+def compute_trends():
     """Returns time-series data aggregated by date."""
     if df_enrolment.empty:
         return []
         
     # Group by date
-    trend = df_enrolment.groupby('date')[['age_0_5', 'age_5_17', 'age_18_greater']].sum().reset_index()
+    trend = query("""
+        SELECT date,
+               SUM(age_0_5)::BIGINT AS age_0_5,
+               SUM(age_5_17)::BIGINT AS age_5_17,
+               SUM(age_18_greater)::BIGINT AS age_18_greater
+        FROM enr
+        WHERE date IS NOT NULL
+        GROUP BY date
+        ORDER BY date
+    """)
     # Convert date to string for JSON serialization
     trend['date'] = trend['date'].dt.strftime('%Y-%m-%d')
     return trend.to_dict(orient='records')
 
-@app.get("/analytics/district-rankings")
-def get_district_rankings(state: str = None):
+@lru_cache(maxsize=1)
+def _trends_json() -> str:
+    return json.dumps(compute_trends())
+
+@app.get("/analytics/trends")
+def get_trends():
+    """Returns time-series data aggregated by date."""
+    return json_response(_trends_json())
+
+def compute_district_rankings(state=None):
     """Returns top performing districts."""
     if df_enrolment.empty:
         return []
     
-    df = df_enrolment.copy()
+    where, params = "", []
     if state:
-        df = df[df['state'] == state]
+        where, params = "WHERE state = ?", [state]
         
-    df['total'] = df['age_0_5'] + df['age_5_17'] + df['age_18_greater']
-    ranked = df.groupby(['state', 'district'])['total'].sum().reset_index().sort_values('total', ascending=False).head(20)
+    ranked = query(f"""
+        SELECT state, district, total
+        FROM district_totals
+        {where}
+        ORDER BY total DESC
+        LIMIT 20
+    """, params)
     return ranked.to_dict(orient='records')
 
+@lru_cache(maxsize=64)
+def _district_rankings_json(state) -> str:
+    return json.dumps(compute_district_rankings(state))
+
+@app.get("/analytics/district-rankings")
+def get_district_rankings(state: str = None):
+    """Returns top performing districts."""
+    return json_response(_district_rankings_json(state or None))
+
+# Warm the parameterless caches at startup so even the first request is a lookup
+_stats_json()
+_state_summary_json()
+_trends_json()
+_district_rankings_json(None)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8000)
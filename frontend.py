@@ -1,10 +1,8 @@
 import streamlit as st
 import pandas as pd
-import glob
-import os
 import requests
-import plotly.express as px
 import plotly.graph_objects as go
+from aadhar_io import load_all
 
 # --- Configuration ---
 st.set_page_config(
@@ -35,52 +33,57 @@ st.markdown("""
 # --- Constants & Data Loading ---
 API_URL = "http://127.0.0.1:8000"
 # For simplicity in this demo, we can perform direct loading if API fails or for speed.
-# However, to be robust, let's load logic mirrored from backend for standalone capability.
+# However, to be robust, we load through the same aadhar_io loader as the backend for standalone capability.
 
-@st.cache_data
+# cache_resource returns the live frames on every rerun (no hash/pickle/copy like cache_data).
+# They are shared across sessions: derived columns belong in aadhar_io, never on the
+# returned objects.
+@st.cache_resource
 def load_data_direct():
-    base_dir = r"l:\Adhar_data"
-    
-    # Helper to find files
-    def get_df(folder_name):
-        path = os.path.join(base_dir, folder_name, folder_name)
-        files = glob.glob(os.path.join(path, "*.csv"))
-        if not files:
-            files = glob.glob(os.path.join(path, "**", "*.csv"), recursive=True)
-            
-        df_list = []
-        for file in files:
-            try:
-                df = pd.read_csv(file)
-                df.columns = df.columns.astype(str).str.strip().str.lower().str.replace(' ', '_')
-                # Date conversion
-                date_col = next((col for col in df.columns if 'date' in col), None)
-                if date_col:
-                    df[date_col] = pd.to_datetime(df[date_col], format='%d-%m-%Y', errors='coerce')
-                df_list.append(df)
-            except: pass
-        
-        df_final = pd.concat(df_list, ignore_index=True) if df_list else pd.DataFrame()
-        # Fill NaNs
-        if not df_final.empty:
-             num_cols = df_final.select_dtypes(include=['number']).columns
-             df_final[num_cols] = df_final[num_cols].fillna(0)
-        return df_final
-
-    return (
-        get_df("api_data_aadhar_enrolment"), 
-        get_df("api_data_aadhar_demographic"), 
-        get_df("api_data_aadhar_biometric")
-    )
+    return load_all()
 
 df_enrolment, df_demographic, df_biometric = load_data_direct()
 
-# --- Computed Fields for Analysis ---
-if not df_enrolment.empty:
-    df_enrolment['total_enrolment'] = df_enrolment['age_0_5'] + df_enrolment['age_5_17'] + df_enrolment['age_18_greater']
+# --- Cached Aggregates ---
+# The frames are static, so page-level aggregates are computed on first render only.
+AGE_GROUPS = ['age_0_5', 'age_5_17', 'age_18_greater']
 
-if not df_biometric.empty:
-    df_biometric['total_biometric'] = df_biometric['bio_age_5_17'] + df_biometric['bio_age_17_']
+@st.cache_data
+def age_group_totals():
+    # One NumPy reduction over the three count columns; int64 accumulator so the
+    # int32 columns can't overflow (NumPy's default int is 32-bit on Windows)
+    counts = df_enrolment[AGE_GROUPS].to_numpy().sum(axis=0, dtype='int64')
+    return pd.DataFrame({'Age Group': AGE_GROUPS, 'Count': counts})
+
+@st.cache_data
+def state_enrolment_totals():
+    return (df_enrolment.groupby('state', sort=False, observed=True)['total_enrolment'].sum()
+            .reset_index().sort_values('total_enrolment', ascending=False))
+
+@st.cache_data
+def district_enrolment_totals(state):
+    # Keyed on the selected state name, so switching back to a state is a cache hit.
+    # Only the two columns the groupby needs are pulled out, not a copy of every column.
+    district_data = df_enrolment.loc[df_enrolment['state'] == state, ['district', 'total_enrolment']]
+    return district_data.groupby('district', sort=False, observed=True)['total_enrolment'].sum().reset_index()
+
+@st.cache_data
+def biometric_gap_by_state():
+    # Sum the two biometric columns per state first, then add the ~30 state rows
+    bio_agg = df_biometric.groupby('state', observed=True)[['bio_age_5_17', 'bio_age_17_']].sum()
+    bio_agg = (bio_agg['bio_age_5_17'] + bio_agg['bio_age_17_']).reset_index(name='total_biometric')
+    enr_agg = df_enrolment.groupby('state', observed=True)['total_enrolment'].sum().reset_index()
+    merged = pd.merge(enr_agg, bio_agg, on='state', how='inner')
+    merged['pending_biometrics'] = merged['total_enrolment'] - merged['total_biometric']
+    merged['coverage_pct'] = (merged['total_biometric'] / merged['total_enrolment']) * 100
+    return merged
+
+@st.cache_data
+def state_correlation_matrix():
+    # Both sides are indexed by state, so an index join replaces the column merge
+    left = df_enrolment.groupby('state', observed=True)[['age_5_17', 'age_18_greater']].sum()
+    right = df_biometric.groupby('state', observed=True)[['bio_age_5_17', 'bio_age_17_']].sum()
+    return left.join(right, how='inner').corr()
 
 
 # --- Sidebar Navigation ---
@@ -96,7 +99,7 @@ if page == "Executive Overview":
     c1, c2, c3, c4 = st.columns(4)
     
     total_enr = df_enrolment['total_enrolment'].sum() if not df_enrolment.empty else 0
-    total_bio = df_biometric['total_biometric'].sum() if not df_biometric.empty else 0
+    total_bio = df_biometric[['bio_age_5_17', 'bio_age_17_']].to_numpy().sum(dtype='int64') if not df_biometric.empty else 0
     total_demo = len(df_demographic)
     
     with c1: st.metric("Unique Enrolments", f"{total_enr:,.0f}", delta="Total")
@@ -108,8 +111,12 @@ if page == "Executive Overview":
     st.markdown("### 📈 Enrolment Trends")
     if not df_enrolment.empty:
         trend = df_enrolment.groupby('date')[['age_0_5', 'age_5_17', 'age_18_greater']].sum().reset_index()
-        fig = px.area(trend, x='date', y=['age_0_5', 'age_5_17', 'age_18_greater'], 
-                      title="Enrolment Trend by Age Group", labels={'value': 'Count', 'variable': 'Age Group'})
+        # Traces are built from the raw arrays rather than px.*, which round-trips the frame through to_dict
+        dates = trend['date'].to_numpy()
+        fig = go.Figure([go.Scatter(x=dates, y=trend[c].to_numpy(), name=c, mode='lines', stackgroup='one')
+                         for c in AGE_GROUPS])
+        fig.update_layout(title="Enrolment Trend by Age Group", xaxis_title='date', yaxis_title='Count',
+                          legend_title_text='Age Group')
         st.plotly_chart(fig, use_container_width=True)
 
 # --- Page: Geographic Analysis ---
@@ -118,14 +125,17 @@ elif page == "Geographic Analysis":
     
     if not df_enrolment.empty:
         # State aggregate
-        state_agg = df_enrolment.groupby('state')['total_enrolment'].sum().reset_index().sort_values('total_enrolment', ascending=False)
+        state_agg = state_enrolment_totals()
         
         c1, c2 = st.columns([2, 1])
         
         with c1:
             st.subheader("State-wise Enrolment Volume")
-            fig = px.bar(state_agg, x='state', y='total_enrolment', color='total_enrolment', 
-                         color_continuous_scale='Viridis', title="Enrolments per State")
+            totals_arr = state_agg['total_enrolment'].to_numpy()
+            fig = go.Figure(go.Bar(x=state_agg['state'].to_numpy(), y=totals_arr,
+                                   marker=dict(color=totals_arr, coloraxis='coloraxis')))
+            fig.update_layout(title="Enrolments per State", xaxis_title='state', yaxis_title='total_enrolment',
+                              coloraxis=dict(colorscale='Viridis', colorbar_title='total_enrolment'))
             st.plotly_chart(fig, use_container_width=True)
             
         with c2:
@@ -135,13 +145,16 @@ elif page == "Geographic Analysis":
         # Drill Down
         st.divider()
         st.subheader("🔍 District Drill-down")
-        selected_state = st.selectbox("Select State for Breakdown", state_agg['state'].unique())
+        selected_state = st.selectbox("Select State for Breakdown", list(state_agg['state'].unique()))
         
-        district_data = df_enrolment[df_enrolment['state'] == selected_state]
-        district_agg = district_data.groupby('district')['total_enrolment'].sum().reset_index()
+        district_agg = district_enrolment_totals(selected_state)
         
-        fig2 = px.treemap(district_agg, path=['district'], values='total_enrolment', 
-                          title=f"District Distribution in {selected_state}", color='total_enrolment')
+        district_totals = district_agg['total_enrolment'].to_numpy()
+        fig2 = go.Figure(go.Treemap(labels=district_agg['district'].to_numpy(), parents=[""] * len(district_agg),
+                                    values=district_totals,
+                                    marker=dict(colors=district_totals, coloraxis='coloraxis')))
+        fig2.update_layout(title=f"District Distribution in {selected_state}",
+                           coloraxis_colorbar_title='total_enrolment')
         st.plotly_chart(fig2, use_container_width=True)
 
 # --- Page: Demographic Insights ---
@@ -152,13 +165,13 @@ elif page == "Demographic Insights":
         st.markdown("### Age Group Ratios")
         
         # Calculate Totals
-        totals = df_enrolment[['age_0_5', 'age_5_17', 'age_18_greater']].sum().reset_index()
-        totals.columns = ['Age Group', 'Count']
+        totals = age_group_totals()
         
         c1, c2 = st.columns(2)
         with c1:
-            fig = px.pie(totals, values='Count', names='Age Group', hole=0.4, title="Overall Age Distribution")
-            fig.update_traces(textinfo='percent+label')
+            fig = go.Figure(go.Pie(labels=totals['Age Group'].to_numpy(), values=totals['Count'].to_numpy(),
+                                   hole=0.4, textinfo='percent+label'))
+            fig.update_layout(title="Overall Age Distribution")
             st.plotly_chart(fig, use_container_width=True)
             
         with c2:
@@ -172,10 +185,16 @@ elif page == "Demographic Insights":
         # Scatter Plot - District Comparison
         st.markdown("### District Cluster Analysis")
         # Aggregating by district
-        dist_scatter = df_enrolment.groupby(['state', 'district'])[['age_0_5', 'age_18_greater']].sum().reset_index()
-        fig_scatter = px.scatter(dist_scatter, x='age_0_5', y='age_18_greater', color='state', 
-                                 hover_data=['district'], title="Infant vs Adult Enrolments per District",
-                                 size_max=60)
+        dist_scatter = df_enrolment.groupby(['state', 'district'], observed=True)[['age_0_5', 'age_18_greater']].sum().reset_index()
+        # One trace per state, as px.scatter(color='state') would draw
+        fig_scatter = go.Figure([
+            go.Scatter(x=grp['age_0_5'].to_numpy(), y=grp['age_18_greater'].to_numpy(), mode='markers',
+                       name=state, customdata=grp['district'].to_numpy(),
+                       hovertemplate="district=%{customdata}<br>age_0_5=%{x}<br>age_18_greater=%{y}")
+            for state, grp in dist_scatter.groupby('state', observed=True)
+        ])
+        fig_scatter.update_layout(title="Infant vs Adult Enrolments per District", xaxis_title='age_0_5',
+                                  yaxis_title='age_18_greater', legend_title_text='state')
         st.plotly_chart(fig_scatter, use_container_width=True)
 
 # --- Page: Biometric Performance ---
@@ -184,12 +203,7 @@ elif page == "Biometric Performance":
     
     if not df_biometric.empty and not df_enrolment.empty:
         # Merge State Aggregates
-        bio_agg = df_biometric.groupby('state')['total_biometric'].sum().reset_index()
-        enr_agg = df_enrolment.groupby('state')['total_enrolment'].sum().reset_index()
-        
-        merged = pd.merge(enr_agg, bio_agg, on='state', how='inner')
-        merged['pending_biometrics'] = merged['total_enrolment'] - merged['total_biometric']
-        merged['coverage_pct'] = (merged['total_biometric'] / merged['total_enrolment']) * 100
+        merged = biometric_gap_by_state()
         
         st.markdown("### Enrolment vs Biometric Capture Gap")
         
@@ -202,8 +216,10 @@ elif page == "Biometric Performance":
         
         st.markdown("### Correlation Matrix")
         st.write("Correlating Demographic variables with Biometric counts.")
-        corr = df_enrolment.groupby('state')[['age_5_17', 'age_18_greater']].sum().merge(
-               df_biometric.groupby('state')[['bio_age_5_17', 'bio_age_17_']].sum(), on='state').corr()
+        corr = state_correlation_matrix()
         
-        fig_hm = px.imshow(corr, text_auto=True, aspect="auto", color_continuous_scale='RdBu_r', title="Correlation Heatmap")
+        fig_hm = go.Figure(go.Heatmap(z=corr.to_numpy(), x=list(corr.columns), y=list(corr.index),
+                                      colorscale='RdBu_r', texttemplate='%{z}'))
+        # imshow draws the first row at the top
+        fig_hm.update_layout(title="Correlation Heatmap", yaxis_autorange='reversed')
         st.plotly_chart(fig_hm, use_container_width=True)